@@ -4,16 +4,24 @@ MCP Client API - Backend Service
 Provides REST API endpoints for the MCP Client frontend to interact with AI providers and MCP servers
 """
 
-from flask import Flask, request, jsonify
+from quart import Quart, Response, request, jsonify, send_from_directory
+from quart.json.provider import DefaultJSONProvider
 import asyncio
 import os
-import json
+import orjson
 import sys
+import hashlib
+import gzip
 import logging
-import requests
-from typing import Dict, Any, List, Optional
-from functools import wraps
-from flask_cors import CORS
+import mimetypes
+import aiohttp
+import operator
+from cachetools import TTLCache
+from contextlib import AsyncExitStack
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, NamedTuple, Optional
+from quart_cors import cors
+from werkzeug.utils import safe_join
 
 # Configure logging
 logging.basicConfig(
@@ -29,26 +37,35 @@ try:
     from mcp import StdioServerParameters
     from mcp.client.session import ClientSession
     from mcp.client.stdio import stdio_client
+    import anyio
 except ImportError:
     logger.error("Error: Official MCP SDK not found. Please install it with 'pip install mcp'.")
     sys.exit(1)
 
 # Import AI provider SDKs
 try:
-    from anthropic import Anthropic
+    from anthropic import AsyncAnthropic
+    import httpx
     ANTHROPIC_AVAILABLE = True
 except ImportError:
     ANTHROPIC_AVAILABLE = False
     logger.warning("Anthropic SDK not found. Anthropic integration will be disabled.")
 
+# Brotli is optional; responses fall back to gzip without it
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
 # MCP servers configuration
 try:
-    with open(os.path.join(os.path.dirname(__file__), 'config.json'), 'r') as config_file:
-        MCP_SERVERS_CONFIG = json.load(config_file)
+    with open(os.path.join(os.path.dirname(__file__), 'config.json'), 'rb') as config_file:
+        MCP_SERVERS_CONFIG = orjson.loads(config_file.read())
     logger.info("Successfully loaded server configurations from config.json")
 except Exception as e:
     logger.error(f"Error loading config.json: {e}")
@@ -69,33 +86,210 @@ except Exception as e:
     }
     logger.info("Using default server configurations")
 
-# Initialize Flask app
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'front'), static_url_path='')
-CORS(app)  # Enable CORS for all routes
+# Resolve node tooling once; only needed for the Windows command rewrites below
+if sys.platform.startswith('win'):
+    import shutil
+    NODE_PATH = shutil.which("node")
+    NPM_PATH = shutil.which("npm")
+    NPX_PATH = shutil.which("npx")
+    
+    logger.info(f"Node path: {NODE_PATH}")
+    logger.info(f"NPM path: {NPM_PATH}")
+    logger.info(f"NPX path: {NPX_PATH}")
+else:
+    NODE_PATH = NPM_PATH = NPX_PATH = None
+
+# Legacy batch file wrappers -> equivalent npm exec arguments
+_LEGACY_BAT_ARGS = {
+    "run_brave_search.bat": ("exec", "--yes", "@modelcontextprotocol/server-brave-search"),
+    "run_github.bat": ("exec", "--yes", "@modelcontextprotocol/server-github"),
+    "run_puppeteer.bat": ("exec", "--yes", "@modelcontextprotocol/server-puppeteer"),
+    "run_memory.bat": ("exec", "--yes", "@modelcontextprotocol/server-memory"),
+    "run_gmail.bat": ("exec", "@gongrzhe/server-gmail-autoauth-mcp"),
+}
+
+def _legacy_bat_args(bat_file):
+    """Return the npm exec arguments for a legacy batch file, or None if it isn't one"""
+    for name, npm_args in _LEGACY_BAT_ARGS.items():
+        if name in bat_file:
+            return npm_args
+    return None
+
+def _build_launch_spec(server_config):
+    """Turn a server config entry into the (command, args, env) used to launch it"""
+    # Handle node-based commands (npx, npm, node) on Windows
+    command = server_config["command"]
+    args = list(server_config["args"])  # Create a copy to avoid modifying the original
+    
+    # Set environment variables from the server configuration; merged once here and
+    # reused by every connect. Only the keys are logged, values are often secrets
+    if "env" in server_config and server_config["env"]:
+        env_vars = {**os.environ, **server_config["env"]}
+        logger.debug("Environment variables for %s: %s", server_config["command"], list(server_config["env"]))
+    else:
+        env_vars = None
+    
+    if sys.platform.startswith('win'):
+        # Handle different command types on Windows
+        if command == "npx" and NPM_PATH:
+            # Use npm exec instead of npx for better Windows compatibility
+            logger.info(f"Using npm exec instead of npx for better Windows compatibility")
+            command = NPM_PATH
+            # Transform npx -y package to npm exec package
+            new_args = ["exec"]
+            if "-y" in args:
+                args.remove("-y")
+                new_args.append("--yes")
+            new_args.extend(args)
+            args = new_args
+        elif command == "node" and NODE_PATH:
+            # Use full path to node
+            command = NODE_PATH
+        
+        # For legacy batch file configs that might still be in the system
+        elif command == "cmd.exe" and "/c" in args and len(args) > 1 and _legacy_bat_args(args[1]) is not None:
+            logger.info(f"Legacy batch file configuration detected. Using direct npm exec instead.")
+            # Convert batch file execution to npm exec
+            if NPM_PATH:
+                args = list(_legacy_bat_args(args[1]))
+                command = NPM_PATH
+    
+    return command, args, env_vars
+
+# Index of enabled servers -> launch spec, built once so connecting is a single lookup
+_SERVER_INDEX = {
+    server_name: _build_launch_spec(server_config)
+    for server_name, server_config in MCP_SERVERS_CONFIG["mcpServers"].items()
+    if not server_config.get("disabled", False)
+}
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson, so jsonify and get_json skip the stdlib json module"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
+
+# Initialize Quart app (ASGI) so MCP handlers run as coroutines on a single persistent loop
+# Quart's own static route is disabled so /<path:path> reaches serve_frontend and its memory cache
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'front')
+app = Quart(__name__, static_folder=None)
+app = cors(app, allow_origin="*")  # Enable CORS for all routes
+app.json = OrjsonProvider(app)
+
+# JSON bodies smaller than this aren't worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+@app.after_request
+async def compress_json(response):
+    """Compress large JSON responses (model lists, tool schemas) with br or gzip"""
+    if (
+        response.mimetype != 'application/json'
+        or response.status_code != 200
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+    
+    # best_match honours q-values, so an encoding refused with q=0 is never chosen
+    offered = ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+    encoding = request.accept_encodings.best_match(offered)
+    if encoding is None:
+        return response
+    
+    body = await response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(brotli.compress(body, quality=5) if encoding == 'br' else gzip.compress(body, compresslevel=6))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def _load_static_files(root):
+    """Read every frontend file into memory as path -> (content, mimetype)"""
+    static_files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full_path, root).replace(os.sep, '/')
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            with open(full_path, 'rb') as static_file:
+                static_files[rel_path] = (static_file.read(), mimetype)
+    return static_files
+
+# The frontend is small, so serve it from memory instead of hitting the disk per request
+_STATIC = _load_static_files(FRONTEND_DIR)
+logger.info(f"Cached {len(_STATIC)} frontend files in memory")
+
+try:
+    with open(os.path.join(os.path.dirname(__file__), 'test.html'), 'rb') as test_file:
+        _TEST_HTML = test_file.read()
+except FileNotFoundError:
+    _TEST_HTML = None
 
 # Root route - redirect to frontend index.html
 @app.route('/')
-def index():
-    return app.send_static_file('index.html')
+async def index():
+    return await serve_frontend('index.html')
 
 # Serve frontend files
 @app.route('/<path:path>')
-def serve_frontend(path):
-    try:
-        # First try to serve from the static folder (frontend)
-        return app.send_static_file(path)
-    except:
-        # If file not found, return 404
-        return f"File {path} not found", 404
+async def serve_frontend(path):
+    static_file = _STATIC.get(path)
+    if static_file is not None:
+        body, mimetype = static_file
+        return Response(body, mimetype=mimetype)
+    
+    # Fall back to disk for files added after startup; validate the path up front
+    # (safe_join rejects traversal) so the miss path never raises
+    full_path = safe_join(FRONTEND_DIR, path)
+    if full_path and os.path.isfile(full_path):
+        return await send_from_directory(FRONTEND_DIR, path)
+    
+    # If file not found, return 404
+    return f"File {path} not found", 404
 
 # Serve test.html
 @app.route('/test.html')
-def test_interface():
-    try:
-        with open(os.path.join(os.path.dirname(__file__), 'test.html'), 'r') as file:
-            return file.read()
-    except FileNotFoundError:
+async def test_interface():
+    if _TEST_HTML is None:
         return "Test interface file not found. Please ensure test.html exists in the back directory.", 404
+    return Response(_TEST_HTML, mimetype='text/html')
+
+def tool_result_text(result):
+    """Render an MCP tool result (content list or error dict) as plain text"""
+    if isinstance(result, list):
+        return "\n".join(getattr(item, "text", None) or str(item) for item in result)
+    return str(result)
+
+def tool_result_payload(result):
+    """Convert an MCP tool result into JSON-serializable data"""
+    if isinstance(result, list):
+        return [item.model_dump() if hasattr(item, "model_dump") else item for item in result]
+    return result
+
+class ToolRef(NamedTuple):
+    """A tool exposed to Claude and the MCP server that provides it"""
+    server: str
+    name: str
+    description: str
+    schema: dict
+
+class ServerConnection(NamedTuple):
+    """Resources owned by one live server connection"""
+    exit_stack: AsyncExitStack
+    # Receive side of the transport; its send side closes when the server's stdout hits EOF
+    read_stream: Any
 
 # Initialize MCP Client - custom wrapper for the mcp SDK
 class MCPClient:
@@ -105,13 +299,34 @@ class MCPClient:
     def __init__(self):
         """Initialize the MCP client"""
         self.sessions = {}
-        self.exit_stacks = {}
+        # Each connection keeps its own exit stack so a dead server can be closed on its own
+        self._connections = {}
+        # Guards sessions/_connections now that servers are connected concurrently
+        self._lock = asyncio.Lock()
+        # In-flight connection attempt per server, so overlapping connects share one spawn
+        self._connect_tasks = {}
+        # Tool lists per server, fetched once per connection
+        self.tools_cache = {}
+        # Pre-encoded /api/mcp/tools response body per server, built from tools_cache
+        self.tools_json = {}
+        # Flattened Claude tool definitions, rebuilt only when tools_cache changes
+        self.claude_tools_cache = None
+        self.claude_tools_json = None
+        # Claude-visible tool name -> ToolRef
+        self.tool_registry = {}
+        # Caps how many tool calls from one Claude response run at the same time
+        self._tool_semaphore = asyncio.Semaphore(8)
+        # Background task that keeps server subprocesses warm and reconnects dead ones
+        self._watchdog_task = None
+        # Created at startup on the process-wide Anthropic transport, see attach_anthropic
         self.anthropic = None
-        
-        # Check if Anthropic API key is set
+    
+    def attach_anthropic(self, http_client):
+        """Create the Claude client on the shared HTTP/2 pool if an Anthropic API key is set"""
         anthropic_api_key = os.environ.get('ANTHROPIC_API_KEY')
         if anthropic_api_key and ANTHROPIC_AVAILABLE:
-            self.anthropic = Anthropic(api_key=anthropic_api_key)
+            # Follow-up Claude calls reuse the same pooled TLS connection
+            self.anthropic = AsyncAnthropic(api_key=anthropic_api_key, http_client=http_client)
     
     async def list_servers(self):
         """List all available MCP servers"""
@@ -127,118 +342,68 @@ class MCPClient:
             status = "Available"
             servers.append({
                 "name": server_name, 
-                "config": server_config,
-                "status": status
+                "status": status,
+                "tools": [tool.name for tool in self.tools_cache.get(server_name, [])]
             })
-            logger.info(f"- {server_name}: {status}")
+            logger.info("- %s: %s", server_name, status)
         
         return servers
     
     async def connect_to_server(self, server_name):
-        """Connect to a specific MCP server"""
+        """Connect to a specific MCP server, joining an attempt that is already in flight"""
+        if server_name in self.sessions:
+            logger.info("Already connected to %s", server_name)
+            return True
+        
+        # The check and the registration below don't await, so no lock is needed
+        task = self._connect_tasks.get(server_name)
+        if task is None:
+            task = asyncio.create_task(self._connect(server_name))
+            self._connect_tasks[server_name] = task
+            task.add_done_callback(lambda done: self._forget_connect_task(server_name, done))
+        
+        # Shielded so a caller that gives up doesn't cancel the attempt for everyone else
+        return await asyncio.shield(task)
+    
+    def _forget_connect_task(self, server_name, task):
+        """Drop a finished connection attempt unless a newer one has replaced it"""
+        if self._connect_tasks.get(server_name) is task:
+            del self._connect_tasks[server_name]
+    
+    async def _connect(self, server_name):
+        """Spawn and initialize a server; only ever run once at a time per server"""
+        exit_stack = None
         try:
-            logger.info(f"Connecting to server: {server_name}")
-            
-            # Get server config from MCP_SERVERS_CONFIG
-            server_config = MCP_SERVERS_CONFIG["mcpServers"].get(server_name)
-            if not server_config:
-                logger.error(f"Unknown server: {server_name}")
-                return False
+            logger.info("Connecting to server: %s", server_name)
             
-            # Skip if server is disabled
-            if server_config.get("disabled", False):
-                logger.error(f"Server {server_name} is disabled")
+            # Get the precomputed launch command from the server index
+            launch_spec = _SERVER_INDEX.get(server_name)
+            if launch_spec is None:
+                if server_name in MCP_SERVERS_CONFIG["mcpServers"]:
+                    # Skip if server is disabled
+                    logger.error("Server %s is disabled", server_name)
+                else:
+                    logger.error("Unknown server: %s", server_name)
                 return False
             
             # Check if already connected
             if server_name in self.sessions:
-                logger.info(f"Already connected to {server_name}")
+                logger.info("Already connected to %s", server_name)
                 return True
             
-            # Clean up any existing resources for this server before creating new ones
-            if server_name in self.exit_stacks:
-                try:
-                    old_stack = self.exit_stacks[server_name]
-                    del self.exit_stacks[server_name]
-                    try:
-                        await asyncio.wait_for(old_stack.aclose(), 0.5)
-                    except Exception as e:
-                        logger.warning(f"Error cleaning up previous resources for {server_name}: {e}")
-                except Exception as e:
-                    logger.warning(f"Error handling previous exit stack for {server_name}: {e}")
-            
-            # Create exit stack for resource management
-            from contextlib import AsyncExitStack
-            exit_stack = AsyncExitStack()
-            self.exit_stacks[server_name] = exit_stack
-            
-            # Handle node-based commands (npx, npm, node) on Windows
-            command = server_config["command"]
-            args = server_config["args"].copy()  # Create a copy to avoid modifying the original
-            
             # Special handling for the terminal-controller to fix the asyncio issue
             if server_name == "terminal-controller":
                 logger.info("Using special handling for terminal-controller server")
                 # Skip the terminal-controller server for now due to asyncio compatibility issues
-                logger.warning(f"Skipping terminal-controller server due to asyncio compatibility issues")
+                logger.warning("Skipping terminal-controller server due to asyncio compatibility issues")
                 return False
             
-            # Set environment variables from the server configuration
-            if "env" in server_config and server_config["env"]:
-                env_vars = os.environ.copy()
-                for key, value in server_config["env"].items():
-                    env_vars[key] = value
-                    logger.info(f"Set environment variable: {key}={value}")
-            else:
-                env_vars = None
+            # Each attempt gets its own stack, which becomes the server's ServerConnection stack
+            # on success or is unwound on failure without touching any other server
+            exit_stack = AsyncExitStack()
+            self._invalidate_tools(server_name)
             
-            if sys.platform.startswith('win'):
-                # Try to find npm and node executables
-                import shutil
-                node_path = shutil.which("node")
-                npm_path = shutil.which("npm")
-                npx_path = shutil.which("npx")
-                
-                logger.info(f"Node path: {node_path}")
-                logger.info(f"NPM path: {npm_path}")
-                logger.info(f"NPX path: {npx_path}")
-                
-                # Handle different command types on Windows
-                if command == "npx" and npm_path:
-                    # Use npm exec instead of npx for better Windows compatibility
-                    logger.info(f"Using npm exec instead of npx for better Windows compatibility")
-                    command = npm_path
-                    # Transform npx -y package to npm exec package
-                    new_args = ["exec"]
-                    if "-y" in args:
-                        args.remove("-y")
-                        new_args.append("--yes")
-                    new_args.extend(args)
-                    args = new_args
-                elif command == "node" and node_path:
-                    # Use full path to node
-                    command = node_path
-                
-                # For legacy batch file configs that might still be in the system
-                elif command == "cmd.exe" and "/c" in args and any(bat_file in (args[1] if len(args) > 1 else "") for bat_file in ["run_brave_search.bat", "run_github.bat", "run_puppeteer.bat", "run_memory.bat", "run_gmail.bat"]):
-                    logger.info(f"Legacy batch file configuration detected. Using direct npm exec instead.")
-                    # Convert batch file execution to npm exec
-                    bat_file = args[1]
-                    if "brave_search" in bat_file and npm_path:
-                        command = npm_path
-                        args = ["exec", "--yes", "@modelcontextprotocol/server-brave-search"]
-                    elif "github" in bat_file and npm_path:
-                        command = npm_path
-                        args = ["exec", "--yes", "@modelcontextprotocol/server-github"]
-                    elif "puppeteer" in bat_file and npm_path:
-                        command = npm_path
-                        args = ["exec", "--yes", "@modelcontextprotocol/server-puppeteer"]
-                    elif "memory" in bat_file and npm_path:
-                        command = npm_path
-                        args = ["exec", "--yes", "@modelcontextprotocol/server-memory"]
-                    elif "gmail" in bat_file and npm_path:
-                        command = npm_path
-                        args = ["exec", "@gongrzhe/server-gmail-autoauth-mcp"]
+            command, args, env_vars = launch_spec
             
             # Set up server parameters using config
             server_params = StdioServerParameters(
@@ -250,7 +415,7 @@ class MCPClient:
             # Use a timeout for connection to avoid hanging
             try:
                 # Create client connection with timeout
-                logger.info(f"Starting {command} with args: {args}")
+                logger.info("Starting %s with args: %s", command, args)
                 
                 async def setup_connection():
                     try:
@@ -260,105 +425,208 @@ class MCPClient:
                         # Create and initialize client session
                         session = await exit_stack.enter_async_context(ClientSession(stdin, send))
                         await session.initialize()
-                        return session
+                        return session, stdin
                     except RuntimeError as re:
                         if "cancel scope in a different task" in str(re):
-                            logger.warning(f"Suppressing asyncio task scope error in stdio_client: {re}")
+                            logger.warning("Suppressing asyncio task scope error in stdio_client: %s", re)
                             # Re-raise as CancelledError which is handled more gracefully
                             raise asyncio.CancelledError("Operation cancelled due to task scope conflict")
                         raise
                 
                 # Set a timeout for the connection process
                 try:
-                    session = await asyncio.wait_for(setup_connection(), 10.0)  # 10-second timeout
-                    self.sessions[server_name] = session
-                    logger.info(f"Successfully connected to {server_name}")
+                    session, read_stream = await asyncio.wait_for(setup_connection(), 10.0)  # 10-second timeout
+                    async with self._lock:
+                        self._connections[server_name] = ServerConnection(exit_stack, read_stream)
+                        self.sessions[server_name] = session
+                    logger.info("Successfully connected to %s", server_name)
+                    
+                    # Fetch the tool list once now so later queries can reuse it
+                    try:
+                        await self._fetch_tools(server_name)
+                    except Exception as e:
+                        logger.warning("Could not prefetch tools for %s: %s", server_name, e)
                     return True
                 except asyncio.CancelledError as ce:
-                    logger.error(f"Connection to {server_name} was cancelled: {ce}")
+                    logger.error("Connection to %s was cancelled: %s", server_name, ce)
                     # Ensure we clean up properly
-                    if server_name in self.exit_stacks:
-                        try:
-                            failed_stack = self.exit_stacks[server_name]
-                            del self.exit_stacks[server_name]
-                            await failed_stack.aclose()
-                        except Exception as cleanup_err:
-                            logger.warning(f"Error cleaning up after cancellation for {server_name}: {cleanup_err}")
+                    try:
+                        self._invalidate_tools(server_name)
+                        await exit_stack.aclose()
+                    except Exception as cleanup_err:
+                        logger.warning("Error cleaning up after cancellation for %s: %s", server_name, cleanup_err)
                     return False
                 
             except asyncio.TimeoutError:
-                logger.error(f"Timeout connecting to {server_name} after 10 seconds")
+                logger.error("Timeout connecting to %s after 10 seconds", server_name)
                 # Clean up exit stack if connection timed out
-                if server_name in self.exit_stacks:
-                    try:
-                        failed_stack = self.exit_stacks[server_name]
-                        del self.exit_stacks[server_name]
-                        await failed_stack.aclose()
-                    except Exception as e:
-                        logger.warning(f"Error cleaning up after timeout for {server_name}: {e}")
+                try:
+                    self._invalidate_tools(server_name)
+                    await exit_stack.aclose()
+                except Exception as e:
+                    logger.warning("Error cleaning up after timeout for %s: %s", server_name, e)
                 return False
             
         except Exception as e:
-            logger.error(f"Failed to connect to {server_name}: {e}")
+            logger.error("Failed to connect to %s: %s", server_name, e)
             # Clean up exit stack if connection failed
-            if server_name in self.exit_stacks:
+            if exit_stack is not None:
                 try:
-                    failed_stack = self.exit_stacks[server_name]
-                    del self.exit_stacks[server_name]
-                    await failed_stack.aclose()
+                    self._invalidate_tools(server_name)
+                    await exit_stack.aclose()
                 except Exception as cleanup_err:
-                    logger.warning(f"Error cleaning up after failed connection for {server_name}: {cleanup_err}")
+                    logger.warning("Error cleaning up after failed connection for %s: %s", server_name, cleanup_err)
             return False
     
     async def connect_to_all_servers(self):
         """Connect to all available MCP servers"""
-        servers = await self.list_servers()
-        connected = []
+        # Servers with a live session are kept as-is; only the rest are (re)connected
+        connected = [name for name in _SERVER_INDEX if name in self.sessions]
+        pending = [name for name in _SERVER_INDEX if name not in self.sessions]
         
-        for server in servers:
-            try:
-                success = await self.connect_to_server(server["name"])
-                if success:
-                    connected.append(server["name"])
-            except asyncio.CancelledError:
-                logger.warning(f"Connection to {server['name']} was cancelled")
-                # Skip this server and continue with others
-                continue
-            except Exception as e:
-                logger.error(f"Unexpected error connecting to {server['name']}: {e}")
-                # Skip this server and continue with others
-                continue
+        # Start every connection at once so subprocess spawns and handshakes overlap
+        tasks = [asyncio.create_task(self.connect_to_server(name)) for name in pending]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for server_name, result in zip(pending, results):
+            # Failed servers are skipped so the others still get connected
+            if isinstance(result, asyncio.CancelledError):
+                logger.warning("Connection to %s was cancelled", server_name)
+            elif isinstance(result, BaseException):
+                logger.error("Unexpected error connecting to %s: %s", server_name, result)
+            elif result:
+                connected.append(server_name)
         
-        logger.info(f"Connected to {len(connected)} servers: {', '.join(connected) if connected else 'none'}")
+        logger.info("Connected to %d servers: %s", len(connected), ', '.join(connected) if connected else 'none')
         return connected
     
+    def start_watchdog(self, interval=30.0):
+        """Start the background health check if it isn't already running"""
+        if self._watchdog_task is None or self._watchdog_task.done():
+            self._watchdog_task = asyncio.create_task(self._watchdog(interval))
+    
+    async def _watchdog(self, interval):
+        """Ping every connected server periodically and reconnect the ones that stopped answering"""
+        while True:
+            await asyncio.sleep(interval)
+            for server_name, session in list(self.sessions.items()):
+                try:
+                    await asyncio.wait_for(session.send_ping(), 5.0)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # A slow or erroring ping from a live server is no reason to spawn a second copy
+                    if not self._at_eof(server_name, e):
+                        logger.warning("Server %s did not answer ping (%s), keeping the connection", server_name, str(e) or type(e).__name__)
+                        continue
+                    logger.warning("Server %s exited, reconnecting", server_name)
+                    await self._close_connection(server_name)
+                    await self.connect_to_server(server_name)
+    
+    def _at_eof(self, server_name, error):
+        """Whether a failed ping means the server's transport has closed"""
+        if isinstance(error, (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)):
+            return True
+        connection = self._connections.get(server_name)
+        return connection is not None and connection.read_stream.statistics().open_send_streams == 0
+    
+    async def _close_connection(self, server_name, timeout=2.0):
+        """Forget a server's session and unwind its own exit stack, terminating the process"""
+        async with self._lock:
+            self.sessions.pop(server_name, None)
+            connection = self._connections.pop(server_name, None)
+            self._invalidate_tools(server_name)
+        if connection is None:
+            return
+        
+        try:
+            # Use a short timeout to avoid hanging
+            await asyncio.wait_for(connection.exit_stack.aclose(), timeout)
+            logger.info("Closed connection to %s", server_name)
+        except asyncio.TimeoutError:
+            logger.warning("Timeout closing connection to %s, proceeding anyway", server_name)
+        except RuntimeError as re:
+            # The transport was entered by the connecting task; its process is terminated
+            # before the cancel scope complains about being exited from another task
+            if "cancel scope in a different task" in str(re):
+                logger.debug("Ignoring expected asyncio task scope error closing %s: %s", server_name, re)
+            else:
+                logger.error("Runtime error closing connection to %s: %s", server_name, re)
+        except BaseExceptionGroup as beg:
+            logger.warning("Expected exception group closing %s: %s", server_name, beg)
+        except Exception as e:
+            logger.error("Error closing connection to %s: %s", server_name, e)
+    
+    def _invalidate_tools(self, server_name):
+        """Drop cached tools for a server so they are refetched on next use"""
+        self.tools_cache.pop(server_name, None)
+        self.tools_json.pop(server_name, None)
+        self.claude_tools_cache = None
+        self.claude_tools_json = None
+        self.tool_registry = {
+            name: ref for name, ref in self.tool_registry.items()
+            if ref.server != server_name
+        }
+    
+    async def _fetch_tools(self, server_name):
+        """Fetch the tool list from a server and store it in the cache"""
+        response = await self.sessions[server_name].list_tools()
+        self._invalidate_tools(server_name)
+        self.tools_cache[server_name] = response.tools
+        for tool in response.tools:
+            self.tool_registry[f"{server_name}_{tool.name}"] = ToolRef(
+                server_name, tool.name, tool.description, tool.input_schema
+            )
+        return response.tools
+    
     async def list_tools(self, server_name):
         """List tools available on a specific MCP server"""
         if server_name not in self.sessions:
-            logger.error(f"Server {server_name} not connected")
+            logger.error("Server %s not connected", server_name)
             return []
         
         try:
-            session = self.sessions[server_name]
-            response = await session.list_tools()
+            tools = self.tools_cache.get(server_name)
+            if tools is None:
+                tools = await self._fetch_tools(server_name)
             
-            tools = response.tools
-            
-            logger.info(f"Tools available on server '{server_name}':")
-            for tool in tools:
-                logger.info(f"- {tool.name}: {tool.description}")
-                logger.info(f"Input schema: {tool.input_schema}")
+            logger.info("%d tools available on server '%s'", len(tools), server_name)
+            # Per-tool details (schemas especially) are expensive to format, so only at DEBUG
+            if logger.isEnabledFor(logging.DEBUG):
+                for tool in tools:
+                    logger.debug("- %s: %s", tool.name, tool.description)
+                    logger.debug("Input schema: %s", tool.input_schema)
             
             return tools
             
         except Exception as e:
-            logger.error(f"Error listing tools for server {server_name}: {e}")
+            logger.error("Error listing tools for server %s: %s", server_name, e)
             return []
     
+    async def tools_payload(self, server_name):
+        """Return the JSON-encoded tool list for a server, encoding it once per fetch"""
+        payload = self.tools_json.get(server_name)
+        if payload is None:
+            tools = await self.list_tools(server_name)
+            payload = orjson.dumps({
+                "tools": [
+                    {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "schema": tool.input_schema
+                    }
+                    for tool in tools
+                ]
+            })
+            # Failed listings come back empty and uncached, so don't pin them either
+            if server_name in self.tools_cache:
+                self.tools_json[server_name] = payload
+        return payload
+    
     async def call_tool(self, server_name, tool_name, args):
         """Call a tool on a connected MCP server"""
         if server_name not in self.sessions:
-            logger.error(f"Server {server_name} not connected")
+            logger.error("Server %s not connected", server_name)
             return {"error": f"Server {server_name} not connected"}
         
         try:
@@ -367,40 +635,94 @@ class MCPClient:
             return result.content
             
         except Exception as e:
-            logger.error(f"Error calling tool {tool_name} on server {server_name}: {e}")
+            logger.error("Error calling tool %s on server %s: %s", tool_name, server_name, e)
             return {"error": str(e)}
     
+    async def _bounded_call(self, ref, args):
+        """Call a tool while holding the semaphore that caps concurrent tool calls"""
+        async with self._tool_semaphore:
+            return await self.call_tool(ref.server, ref.name, args)
+    
+    def _start_tool_call(self, block):
+        """Schedule the MCP call for a finished tool_use block, or None if the tool is unknown"""
+        ref = self.tool_registry.get(block.name)
+        if ref is None:
+            return None
+        return asyncio.create_task(self._bounded_call(ref, block.input))
+    
+    async def _tool_result(self, block, ref, task):
+        """Wait for the result of a tool_use block, calling the tool now if it wasn't started"""
+        if ref is None:
+            return f"Unknown tool: {block.name}"
+        if task is not None:
+            return await task
+        return await self._bounded_call(ref, block.input)
+    
+    async def _stream_claude(self, messages, claude_tools, start_tools=False):
+        """Stream a Claude response and return the final message plus any started tool calls"""
+        tool_tasks = {}
+        async with self.anthropic.messages.stream(
+            model="claude-3-opus-20240229",  # Use appropriate model
+            max_tokens=1000,
+            messages=messages,
+            tools=claude_tools
+        ) as stream:
+            async for event in stream:
+                # Dispatch each tool call as soon as its block is finalized, overlapping
+                # MCP I/O with the rest of the generation
+                if start_tools and event.type == 'content_block_stop' and event.content_block.type == 'tool_use':
+                    task = self._start_tool_call(event.content_block)
+                    if task is not None:
+                        tool_tasks[event.content_block.id] = task
+            response = await stream.get_final_message()
+        return response, tool_tasks
+    
     async def process_with_ai(self, query):
-        """Process a query using Claude and available tools"""
+        """
+        Process a query using Claude and available tools, yielding each step as an
+        event dict of type 'response', 'tool_call', 'tool_result' or 'error'
+        """
         if not self.anthropic:
             logger.error("Anthropic client not available")
-            return "AI processing not available. Set ANTHROPIC_API_KEY in .env file."
+            yield {"type": "error", "content": "AI processing not available. Set ANTHROPIC_API_KEY in .env file."}
+            return
         
-        logger.info(f"Processing query with AI: {query}")
+        logger.info("Processing query with AI: %s", query)
         
-        # Get all available tools from connected servers
-        all_tools = []
-        for server_name in self.sessions:
-            tools = await self.list_tools(server_name)
-            for tool in tools:
-                all_tools.append({
-                    "server": server_name,
-                    "name": tool.name,
-                    "description": tool.description,
-                    "schema": tool.input_schema
-                })
+        # Build the Claude tool list from the per-server cache, only when it changed
+        if self.claude_tools_cache is None:
+            server_names = list(self.sessions)
+            
+            # Servers whose prefetch failed at connect time are asked now, all at once
+            missing = [name for name in server_names if name not in self.tools_cache]
+            if missing:
+                results = await asyncio.gather(*(self._fetch_tools(name) for name in missing), return_exceptions=True)
+                for server_name, result in zip(missing, results):
+                    if isinstance(result, BaseException):
+                        logger.warning("Error listing tools for server %s: %s", server_name, result)
+            
+            # Format the registered tools of connected servers for Claude
+            claude_tools = [
+                {
+                    "name": claude_name,
+                    "description": ref.description,
+                    "input_schema": ref.schema
+                }
+                for claude_name, ref in self.tool_registry.items()
+            ]
+            
+            # Only memoize once every connected server has answered
+            if all(name in self.tools_cache for name in self.sessions):
+                self.claude_tools_json = orjson.dumps(claude_tools)
+                # Freeze the shared definitions so concurrent queries can't mutate them
+                claude_tools = tuple(MappingProxyType(tool) for tool in claude_tools)
+                self.claude_tools_cache = claude_tools
+                logger.debug("Cached %d Claude tool definitions (%d bytes)", len(claude_tools), len(self.claude_tools_json))
+        else:
+            claude_tools = self.claude_tools_cache
         
-        if not all_tools:
+        if not claude_tools:
             logger.warning("No tools available for AI to use")
-            
-        # Format tools for Claude
-        claude_tools = []
-        for tool in all_tools:
-            claude_tools.append({
-                "name": f"{tool['server']}_{tool['name']}",
-                "description": tool["description"],
-                "input_schema": tool["schema"]
-            })
         
         # Create initial message
         messages = [
@@ -410,409 +732,492 @@ class MCPClient:
             }
         ]
         
-        # Make initial Claude API call
-        response = self.anthropic.messages.create(
-            model="claude-3-opus-20240229",  # Use appropriate model
-            max_tokens=1000,
-            messages=messages,
-            tools=claude_tools
-        )
+        # Stream the initial Claude response; tool calls start as soon as each block is complete
+        response, tool_tasks = await self._stream_claude(messages, claude_tools, start_tools=True)
         
-        final_text = []
+        tool_blocks = []
         for content in response.content:
             if content.type == 'text':
-                final_text.append(content.text)
+                yield {"type": "response", "content": content.text}
                 
             elif content.type == 'tool_use':
-                tool_name = content.name
-                tool_args = content.input
-                
-                # Parse server and tool name
-                parts = tool_name.split('_', 1)
-                if len(parts) < 2:
-                    final_text.append(f"Error: Invalid tool name format: {tool_name}")
-                    continue
-                    
-                server_name, actual_tool_name = parts
-                
-                final_text.append(f"[Calling tool {actual_tool_name} on server {server_name} with args {tool_args}]")
-                
-                # Execute tool call
-                result = await self.call_tool(server_name, actual_tool_name, tool_args)
-                final_text.append(f"Tool result: {result}")
-                
-                # Add tool result to conversation
-                messages.append({
-                    "role": "assistant",
-                    "content": [content]
-                })
-                messages.append({
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": content.id,
-                            "content": result
-                        }
-                    ]
+                # Resolve server and tool name
+                ref = self.tool_registry.get(content.name)
+                if ref is None:
+                    yield {"type": "error", "content": f"Unknown tool: {content.name}"}
+                else:
+                    yield {"type": "tool_call", "tool": content.name, "args": content.input}
+                tool_blocks.append((content, ref))
+        
+        if tool_blocks:
+            # The calls were started while the response streamed; wait for all of them together
+            results = await asyncio.gather(*(
+                self._tool_result(content, ref, tool_tasks.get(content.id))
+                for content, ref in tool_blocks
+            ))
+            
+            tool_results = []
+            for (content, _), result in zip(tool_blocks, results):
+                yield {"type": "tool_result", "content": tool_result_text(result)}
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": content.id,
+                    "content": result
                 })
-                
-                # Get next response from Claude
-                response = self.anthropic.messages.create(
-                    model="claude-3-opus-20240229",
-                    max_tokens=1000,
-                    messages=messages,
-                    tools=claude_tools
-                )
-                
-                # Add Claude's response
-                final_text.append(response.content[0].text)
-                
-        # Combine all text into final response
-        print("Final response:")
-        print("\n".join(final_text))
-        return "\n".join(final_text)
+            
+            # Add the tool results to the conversation in a single turn
+            messages.append({
+                "role": "assistant",
+                "content": response.content
+            })
+            messages.append({
+                "role": "user",
+                "content": tool_results
+            })
+            
+            # Get next response from Claude
+            follow_up, _ = await self._stream_claude(messages, claude_tools)
+            
+            # Add Claude's response
+            for block in follow_up.content:
+                if block.type == 'text':
+                    yield {"type": "response", "content": block.text}
         
     async def cleanup(self):
         """Clean up all resources"""
-        for server_name, exit_stack in list(self.exit_stacks.items()):
-            try:
-                # Use a more robust approach to clean up resources
-                # Instead of trying to close the exit stack (which can cause task scope errors),
-                # we'll first remove our references to it and let Python's garbage collection handle it
-                
-                # Store a reference to the stack to avoid modifying during iteration
-                stack_to_close = exit_stack
-                
-                # Remove references first
-                if server_name in self.sessions:
-                    del self.sessions[server_name]
-                if server_name in self.exit_stacks:
-                    del self.exit_stacks[server_name]
-                
-                # Now try to close the stack if possible, but don't worry if it fails
-                try:
-                    # Use a very short timeout to avoid hanging
-                    await asyncio.wait_for(stack_to_close.aclose(), 0.5)
-                    logger.info(f"Closed connection to {server_name}")
-                except asyncio.TimeoutError:
-                    logger.warning(f"Timeout closing connection to {server_name}, proceeding anyway")
-                except RuntimeError as re:
-                    # Handle the specific asyncio cancel scope error
-                    if "cancel scope in a different task" in str(re):
-                        logger.warning(f"Ignoring expected asyncio task scope error for {server_name}: {re}")
-                    else:
-                        # Log other runtime errors but continue
-                        logger.error(f"Runtime error closing connection to {server_name}: {re}")
-                except BaseExceptionGroup as beg:
-                    logger.warning(f"Expected exception group during {server_name} cleanup: {beg}")
-                except Exception as e:
-                    logger.error(f"Error closing connection to {server_name}: {e}")
-                
-            except Exception as e:
-                logger.error(f"Error during cleanup for {server_name}: {e}")
-                
+        if self._watchdog_task is not None:
+            self._watchdog_task.cancel()
+            self._watchdog_task = None
+        
+        # Unwind every connection at once, so shutdown takes one close timeout however
+        # many servers there are; the process is sent SIGTERM before the wait starts
+        await asyncio.gather(
+            *(self._close_connection(name, timeout=0.5) for name in list(self._connections))
+        )
+        
         # Clear any remaining references
-        self.sessions.clear()
-        self.exit_stacks.clear()
+        self.tools_cache.clear()
+        self.claude_tools_cache = None
+        self.claude_tools_json = None
+        self.tool_registry.clear()
         logger.info("All server connections cleaned up")
 
 mcp_client = MCPClient()
 
-# Register shutdown handler to clean up resources when the app exits
-import atexit
-import asyncio
+# Spawn every enabled server before the first request so no request pays for a subprocess launch
+@app.before_serving
+async def startup_handler():
+    """Connect to all MCP servers and start the health-check watchdog"""
+    try:
+        await mcp_client.connect_to_all_servers()
+    except Exception as e:
+        logger.error(f"Error pre-connecting to MCP servers: {e}")
+    mcp_client.start_watchdog()
 
-def shutdown_handler():
+# Clean up MCP resources on the serving loop itself when the app shuts down,
+# so subprocess transports are closed by the loop that created them
+@app.after_serving
+async def shutdown_handler():
     """Clean up MCP resources on application shutdown"""
     logger.info("Application shutting down, cleaning up MCP resources")
+    # Run cleanup with a timeout to prevent hanging on shutdown
     try:
-        # Create a new event loop for cleanup
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Run cleanup with a timeout to prevent hanging on shutdown
-        try:
-            loop.run_until_complete(asyncio.wait_for(mcp_client.cleanup(), 5.0))
-        except asyncio.TimeoutError:
-            logger.warning("Cleanup timed out after 5 seconds, forcing shutdown")
-        except Exception as e:
-            logger.error(f"Error during cleanup operation: {e}")
-            
-        # Additional step to ensure all pending tasks are cancelled
-        pending = asyncio.all_tasks(loop)
-        if pending:
-            logger.info(f"Cancelling {len(pending)} pending tasks")
-            for task in pending:
-                task.cancel()
-            
-            # Give tasks a chance to respond to cancellation
-            try:
-                loop.run_until_complete(asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), 1.0))
-            except (asyncio.TimeoutError, asyncio.CancelledError):
-                pass
-                
-        # Close the loop properly
-        loop.run_until_complete(loop.shutdown_asyncgens())
-        loop.close()
+        await asyncio.wait_for(mcp_client.cleanup(), 5.0)
+    except asyncio.TimeoutError:
+        logger.warning("Cleanup timed out after 5 seconds, forcing shutdown")
     except Exception as e:
         logger.error(f"Error during cleanup at shutdown: {e}")
     
     logger.info("Cleanup complete")
 
-atexit.register(shutdown_handler)
+# Global cache for models, bounded so distinct API keys can't grow it forever;
+# entries expire after 10 minutes. Only touched from the event loop, so no lock is needed
+models_cache = TTLCache(maxsize=1024, ttl=600)
 
-# Global cache for models
-models_cache = {}
+# Upstream ETag/Last-Modified per cache key, kept past the TTL so an expired list can
+# be revalidated with a conditional GET: cache key -> (models, etag, last_modified)
+models_validators = TTLCache(maxsize=1024, ttl=86400)
 
-# Helper function to run async functions in Flask routes
-def async_route(f):
-    @wraps(f)
-    def wrapped(*args, **kwargs):
-        return asyncio.run(f(*args, **kwargs))
-    return wrapped
+def _models_cache_key(provider_id, api_key):
+    """Build the model cache key from a hash of the full API key"""
+    # A short key prefix collides across users, so hash the whole key instead
+    return f"{provider_id}_{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+
+# Shared aiohttp session for all AI provider calls; created on the serving loop at startup
+AIO_SESSION = None
+
+# Anthropic clients for user-supplied keys, reused so keep-alive works; they and
+# mcp_client.anthropic all share one httpx pool, so evicting a client doesn't leave
+# a connection pool behind
+_anthropic_clients = TTLCache(maxsize=64, ttl=1800)
+ANTHROPIC_HTTP = None
+
+# Default bounds for upstream calls so a stalled provider can't hold a request forever
+UPSTREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=5, sock_read=30)
+
+# Idempotent upstream GETs are retried on transient gateway errors
+RETRY_STATUSES = frozenset({502, 503, 504})
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.2
+
+@app.before_serving
+async def open_http_session():
+    """Open the pooled HTTP session used for provider requests"""
+    global AIO_SESSION, ANTHROPIC_HTTP
+    AIO_SESSION = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, limit_per_host=30, ttl_dns_cache=300, keepalive_timeout=60),
+        timeout=UPSTREAM_TIMEOUT
+    )
+    if ANTHROPIC_AVAILABLE:
+        ANTHROPIC_HTTP = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+        mcp_client.attach_anthropic(ANTHROPIC_HTTP)
+
+@app.after_serving
+async def close_http_session():
+    """Close the pooled HTTP session"""
+    if AIO_SESSION is not None:
+        await AIO_SESSION.close()
+    _anthropic_clients.clear()
+    mcp_client.anthropic = None
+    if ANTHROPIC_HTTP is not None:
+        await ANTHROPIC_HTTP.aclose()
 
 # ========================
 # AI Provider API Endpoints
 # ========================
 
+# The provider list only depends on installed SDKs, so build it once
+PROVIDERS = [
+    {"id": "openai", "name": "OpenAI", "available": True},
+    {"id": "anthropic", "name": "Anthropic", "available": ANTHROPIC_AVAILABLE},
+    {"id": "gemini", "name": "Google Gemini", "available": True},
+    {"id": "openroute", "name": "OpenRoute", "available": True},
+    {"id": "groq", "name": "Groq", "available": True},
+    {"id": "ollama", "name": "Ollama (Local)", "available": True}
+]
+
+# Pre-encoded providers response and its ETag, so browsers can revalidate with a 304
+_PROVIDERS_JSON = orjson.dumps({"providers": PROVIDERS})
+_PROVIDERS_ETAG = hashlib.md5(_PROVIDERS_JSON).hexdigest()
+
 @app.route('/api/providers', methods=['GET'])
-def get_providers():
+async def get_providers():
     """Get available AI providers"""
-    providers = [
-        {"id": "openai", "name": "OpenAI", "available": True},
-        {"id": "anthropic", "name": "Anthropic", "available": ANTHROPIC_AVAILABLE},
-        {"id": "gemini", "name": "Google Gemini", "available": True},
-        {"id": "openroute", "name": "OpenRoute", "available": True},
-        {"id": "groq", "name": "Groq", "available": True},
-        {"id": "ollama", "name": "Ollama (Local)", "available": True}
-    ]
-    return jsonify({"providers": providers})
+    headers = {'Cache-Control': 'public, max-age=3600', 'ETag': f'"{_PROVIDERS_ETAG}"'}
+    if _PROVIDERS_ETAG in request.if_none_match:
+        return Response(status=304, headers=headers)
+    return Response(_PROVIDERS_JSON, mimetype='application/json', headers=headers)
+
+# Model lists served without an API key, and the fallbacks used when a provider
+# can't be reached. Built once at import; jsonify serializes them without mutating
+_DEFAULT_MODELS = {
+    "openai": (
+        {"id": "gpt-4o", "name": "GPT-4o"},
+        {"id": "gpt-4-turbo", "name": "GPT-4 Turbo"},
+        {"id": "gpt-4", "name": "GPT-4"},
+        {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"}
+    ),
+    "anthropic": (
+        {"id": "claude-3-opus-20240229", "name": "Claude 3 Opus"},
+        {"id": "claude-3-sonnet-20240229", "name": "Claude 3 Sonnet"},
+        {"id": "claude-3-haiku-20240307", "name": "Claude 3 Haiku"},
+        {"id": "claude-2.1", "name": "Claude 2.1"}
+    ),
+    "gemini": (
+        {"id": "gemini-pro", "name": "Gemini Pro"},
+        {"id": "gemini-ultra", "name": "Gemini Ultra"}
+    ),
+    "openroute": (
+        {"id": "openai/gpt-4o", "name": "OpenAI GPT-4o"},
+        {"id": "anthropic/claude-3-opus", "name": "Anthropic Claude 3 Opus"},
+        {"id": "google/gemini-pro", "name": "Google Gemini Pro"},
+        {"id": "meta-llama/llama-3-70b-instruct", "name": "Meta Llama 3 70B"}
+    ),
+    "groq": (
+        {"id": "llama3-70b-8192", "name": "Llama-3 70B"},
+        {"id": "llama3-8b-8192", "name": "Llama-3 8B"},
+        {"id": "mixtral-8x7b-32768", "name": "Mixtral 8x7B"},
+        {"id": "gemma-7b-it", "name": "Gemma 7B"}
+    ),
+    "ollama": (
+        {"id": "llama3", "name": "Llama 3"},
+        {"id": "mistral", "name": "Mistral"},
+        {"id": "gemma", "name": "Gemma"},
+        {"id": "phi", "name": "Phi"}
+    )
+}
+
+# Anthropic has no model listing endpoint, so keyed requests get the full known list
+_ANTHROPIC_MODELS = _DEFAULT_MODELS["anthropic"] + ({"id": "claude-2.0", "name": "Claude 2.0"},)
+
+def _labelled(models, label):
+    """Copy a model list with a status label appended to each name"""
+    return tuple({"id": model["id"], "name": f"{model['name']} ({label})"} for model in models)
+
+_FALLBACK_MODELS = {provider_id: _labelled(models, "Default") for provider_id, models in _DEFAULT_MODELS.items()}
+_FALLBACK_MODELS["ollama"] = _labelled(_DEFAULT_MODELS["ollama"], "Ollama not connected")
+
+def _bearer_headers(api_key, origin):
+    """Headers for providers that authenticate with a bearer token"""
+    return {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
+
+def _openroute_headers(api_key, origin):
+    """Bearer headers plus the attribution headers OpenRoute asks for"""
+    return {**_bearer_headers(api_key, origin), 'HTTP-Referer': origin, 'X-Title': 'MCP Client'}
+
+def _no_headers(api_key, origin):
+    """Providers that take the key in the URL, or no key at all"""
+    return {}
+
+def _chat_body(model_id, message, temperature=0.7):
+    """Request body for OpenAI-compatible chat completion endpoints"""
+    body = {'model': model_id, 'messages': [{'role': 'user', 'content': message}]}
+    if temperature is not None:
+        body['temperature'] = temperature
+    return body
+
+_MODEL_ID = operator.itemgetter('id')
+_MODEL_NAME = operator.itemgetter('name')
+
+def _id_name_list(ids):
+    """Model entries for providers whose display name is just the model id"""
+    return [{"id": model_id, "name": model_id} for model_id in ids]
+
+def _parse_gemini_models(data):
+    """Gemini names models 'models/<id>'; split each name once"""
+    models = []
+    for model in data.get("models", []):
+        name = model["name"]
+        if "gemini" in name:
+            model_id = name.rsplit('/', 1)[-1]
+            models.append({"id": model_id, "name": model.get("displayName", model_id)})
+    return models
+
+def _chat_text(data):
+    """Extract the reply from an OpenAI-compatible chat completion"""
+    return data['choices'][0]['message']['content']
+
+def _get_anthropic(api_key):
+    """Return the cached Anthropic client for an API key, creating it on first use"""
+    key = hashlib.sha256(api_key.encode()).digest()
+    client = _anthropic_clients.get(key)
+    if client is None:
+        client = AsyncAnthropic(
+            api_key=api_key,
+            http_client=ANTHROPIC_HTTP,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            max_retries=MAX_RETRIES
+        )
+        _anthropic_clients[key] = client
+    return client
+
+async def _send_anthropic(api_key, model_id, message):
+    """Send a message through the Anthropic SDK and return the reply text"""
+    response = await _get_anthropic(api_key).messages.create(
+        model=model_id,
+        max_tokens=1000,
+        messages=[
+            {'role': 'user', 'content': message}
+        ]
+    )
+    return response.content[0].text
+
+class ProviderAdapter(NamedTuple):
+    """How to list models from and send messages to one AI provider"""
+    label: str
+    headers: Callable[[str, str], Dict[str, str]]
+    # None when the provider has no listing endpoint and keyed requests get known_models
+    models_url: Optional[Callable[[str], str]]
+    parse_models: Optional[Callable[[Any], List[Dict[str, str]]]]
+    chat_url: Optional[Callable[[str, str], str]]
+    chat_body: Optional[Callable[[str, str], Dict[str, Any]]]
+    parse_chat: Optional[Callable[[Any], str]]
+    # Custom coroutine (api_key, model_id, message) for providers reached through an SDK
+    send: Optional[Callable] = None
+    known_models: tuple = ()
+    requires_key: bool = True
+    models_timeout: aiohttp.ClientTimeout = UPSTREAM_TIMEOUT
+    chat_timeout: aiohttp.ClientTimeout = UPSTREAM_TIMEOUT
+
+PROVIDER_ADAPTERS = {
+    'openai': ProviderAdapter(
+        label='OpenAI',
+        headers=_bearer_headers,
+        models_url=lambda api_key: 'https://api.openai.com/v1/models',
+        parse_models=lambda data: _id_name_list(
+            model_id for model_id in map(_MODEL_ID, data["data"]) if "gpt" in model_id
+        ),
+        chat_url=lambda model_id, api_key: 'https://api.openai.com/v1/chat/completions',
+        chat_body=_chat_body,
+        parse_chat=_chat_text
+    ),
+    'anthropic': ProviderAdapter(
+        label='Anthropic',
+        headers=_no_headers,
+        models_url=None,
+        parse_models=None,
+        chat_url=None,
+        chat_body=None,
+        parse_chat=None,
+        send=_send_anthropic,
+        known_models=_ANTHROPIC_MODELS
+    ),
+    'gemini': ProviderAdapter(
+        label='Gemini',
+        headers=_no_headers,
+        models_url=lambda api_key: f'https://generativelanguage.googleapis.com/v1beta/models?key={api_key}',
+        parse_models=_parse_gemini_models,
+        chat_url=lambda model_id, api_key: f'https://generativelanguage.googleapis.com/v1beta/models/{model_id}:generateContent?key={api_key}',
+        chat_body=lambda model_id, message: {
+            'contents': [{'parts': [{'text': message}]}],
+            'generationConfig': {'temperature': 0.7}
+        },
+        parse_chat=lambda data: data['candidates'][0]['content']['parts'][0]['text']
+    ),
+    'openroute': ProviderAdapter(
+        label='OpenRoute',
+        headers=_openroute_headers,
+        models_url=lambda api_key: 'https://openrouter.ai/api/v1/models',
+        parse_models=lambda data: [
+            {"id": model["id"], "name": model.get("name", model["id"])}
+            for model in data.get("data", [])
+        ],
+        chat_url=lambda model_id, api_key: 'https://openrouter.ai/api/v1/chat/completions',
+        chat_body=lambda model_id, message: _chat_body(model_id, message, temperature=None),
+        parse_chat=_chat_text
+    ),
+    'groq': ProviderAdapter(
+        label='Groq',
+        headers=_bearer_headers,
+        models_url=lambda api_key: 'https://api.groq.com/openai/v1/models',
+        parse_models=lambda data: _id_name_list(map(_MODEL_ID, data.get("data", []))),
+        chat_url=lambda model_id, api_key: 'https://api.groq.com/openai/v1/chat/completions',
+        chat_body=_chat_body,
+        parse_chat=_chat_text
+    ),
+    'ollama': ProviderAdapter(
+        label='Ollama',
+        headers=_no_headers,
+        models_url=lambda api_key: 'http://localhost:11434/api/tags',
+        parse_models=lambda data: _id_name_list(map(_MODEL_NAME, data.get("models", []))),
+        chat_url=lambda model_id, api_key: 'http://localhost:11434/api/generate',
+        chat_body=lambda model_id, message: {'model': model_id, 'prompt': message, 'stream': False},
+        parse_chat=lambda data: data['response'],
+        requires_key=False,
+        models_timeout=aiohttp.ClientTimeout(total=3),
+        # Local inference can legitimately take a while
+        chat_timeout=aiohttp.ClientTimeout(connect=3, sock_read=120)
+    )
+}
+
+# Keyless model responses are fixed, so encode them once at import
+_DEFAULT_RESPONSES = {
+    provider_id: orjson.dumps({"models": _DEFAULT_MODELS[provider_id]})
+    for provider_id, adapter in PROVIDER_ADAPTERS.items()
+    if adapter.requires_key
+}
+
+def _models_response(models, cacheable=False):
+    """Build a models response; only static keyless lists are safe for browsers to cache"""
+    body = models if isinstance(models, bytes) else orjson.dumps({"models": models})
+    response = Response(body, mimetype='application/json')
+    if cacheable:
+        response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
 
 @app.route('/api/models/<provider_id>', methods=['GET'])
-def get_models(provider_id):
+async def get_models(provider_id):
     """Get available models for a specific provider"""
     api_key = request.args.get('api_key', '')
     
-    # Check if models are cached
-    cache_key = f"{provider_id}_{api_key[:5]}"  # Use first 5 chars of API key for cache key
-    if cache_key in models_cache:
-        return jsonify({"models": models_cache[cache_key]})
-    
-    models = []
-    
-    # OpenAI models
-    if provider_id == 'openai':
-        try:
-            if not api_key:
-                # Return default models if no API key
-                models = [
-                    {"id": "gpt-4o", "name": "GPT-4o"},
-                    {"id": "gpt-4-turbo", "name": "GPT-4 Turbo"},
-                    {"id": "gpt-4", "name": "GPT-4"},
-                    {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"}
-                ]
-            else:
-                # Fetch models from OpenAI API
-                response = requests.get(
-                    'https://api.openai.com/v1/models',
-                    headers={'Authorization': f'Bearer {api_key}'}
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    models = [
-                        {"id": model["id"], "name": model["id"]} 
-                        for model in data["data"] 
-                        if "gpt" in model["id"]
-                    ]
-                else:
-                    # Handle error
-                    logger.error(f"Error fetching OpenAI models: {response.text}")
-                    return jsonify({"error": "Failed to fetch models", "details": response.text}), 400
-        except Exception as e:
-            logger.error(f"Error fetching OpenAI models: {e}")
-            models = [
-                {"id": "gpt-4o", "name": "GPT-4o (Default)"},
-                {"id": "gpt-4-turbo", "name": "GPT-4 Turbo (Default)"},
-                {"id": "gpt-4", "name": "GPT-4 (Default)"},
-                {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo (Default)"}
-            ]
+    # Default models if no API key, already encoded
+    if not api_key and provider_id in _DEFAULT_RESPONSES:
+        return _models_response(_DEFAULT_RESPONSES[provider_id], cacheable=True)
     
-    # Anthropic models
-    elif provider_id == 'anthropic':
-        try:
-            if not api_key:
-                # Return default models if no API key
-                models = [
-                    {"id": "claude-3-opus-20240229", "name": "Claude 3 Opus"},
-                    {"id": "claude-3-sonnet-20240229", "name": "Claude 3 Sonnet"},
-                    {"id": "claude-3-haiku-20240307", "name": "Claude 3 Haiku"},
-                    {"id": "claude-2.1", "name": "Claude 2.1"}
-                ]
-            else:
-                # Verify API key by making a small request
-                client = Anthropic(api_key=api_key)
-                # Just check if we can initialize without error
-                models = [
-                    {"id": "claude-3-opus-20240229", "name": "Claude 3 Opus"},
-                    {"id": "claude-3-sonnet-20240229", "name": "Claude 3 Sonnet"},
-                    {"id": "claude-3-haiku-20240307", "name": "Claude 3 Haiku"},
-                    {"id": "claude-2.1", "name": "Claude 2.1"},
-                    {"id": "claude-2.0", "name": "Claude 2.0"}
-                ]
-        except Exception as e:
-            logger.error(f"Error fetching Anthropic models: {e}")
-            models = [
-                {"id": "claude-3-opus-20240229", "name": "Claude 3 Opus (Default)"},
-                {"id": "claude-3-sonnet-20240229", "name": "Claude 3 Sonnet (Default)"},
-                {"id": "claude-3-haiku-20240307", "name": "Claude 3 Haiku (Default)"},
-                {"id": "claude-2.1", "name": "Claude 2.1 (Default)"}
-            ]
+    adapter = PROVIDER_ADAPTERS.get(provider_id)
+    if adapter is None:
+        return jsonify({"error": "Unknown provider"}), 400
     
-    # Google Gemini models
-    elif provider_id == 'gemini':
-        try:
-            if not api_key:
-                # Return default models if no API key
-                models = [
-                    {"id": "gemini-pro", "name": "Gemini Pro"},
-                    {"id": "gemini-ultra", "name": "Gemini Ultra"}
-                ]
-            else:
-                # Fetch models from Gemini API
-                response = requests.get(
-                    f'https://generativelanguage.googleapis.com/v1beta/models?key={api_key}'
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    models = [
-                        {"id": model["name"].split('/')[-1], "name": model.get("displayName", model["name"].split('/')[-1])} 
-                        for model in data.get("models", []) 
-                        if "gemini" in model["name"]
-                    ]
-                else:
-                    # Handle error
-                    logger.error(f"Error fetching Gemini models: {response.text}")
-                    return jsonify({"error": "Failed to fetch models", "details": response.text}), 400
-        except Exception as e:
-            logger.error(f"Error fetching Gemini models: {e}")
-            models = [
-                {"id": "gemini-pro", "name": "Gemini Pro (Default)"},
-                {"id": "gemini-ultra", "name": "Gemini Ultra (Default)"}
-            ]
+    # Live and fallback lists can change between requests; only static ones are cacheable
+    cacheable = not api_key and adapter.models_url is None
     
-    # OpenRoute models
-    elif provider_id == 'openroute':
-        try:
-            if not api_key:
-                # Return default models if no API key
-                models = [
-                    {"id": "openai/gpt-4o", "name": "OpenAI GPT-4o"},
-                    {"id": "anthropic/claude-3-opus", "name": "Anthropic Claude 3 Opus"},
-                    {"id": "google/gemini-pro", "name": "Google Gemini Pro"},
-                    {"id": "meta-llama/llama-3-70b-instruct", "name": "Meta Llama 3 70B"}
-                ]
-            else:
-                # Fetch models from OpenRoute API
-                response = requests.get(
-                    'https://openrouter.ai/api/v1/models',
-                    headers={'Authorization': f'Bearer {api_key}'}
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    models = [
-                        {"id": model["id"], "name": model.get("name", model["id"])} 
-                        for model in data.get("data", [])
-                    ]
-                else:
-                    # Handle error
-                    logger.error(f"Error fetching OpenRoute models: {response.text}")
-                    return jsonify({"error": "Failed to fetch models", "details": response.text}), 400
-        except Exception as e:
-            logger.error(f"Error fetching OpenRoute models: {e}")
-            models = [
-                {"id": "openai/gpt-4o", "name": "OpenAI GPT-4o (Default)"},
-                {"id": "anthropic/claude-3-opus", "name": "Anthropic Claude 3 Opus (Default)"},
-                {"id": "google/gemini-pro", "name": "Google Gemini Pro (Default)"},
-                {"id": "meta-llama/llama-3-70b-instruct", "name": "Meta Llama 3 70B (Default)"}
-            ]
-    
-    # Groq models
-    elif provider_id == 'groq':
-        try:
-            if not api_key:
-                # Return default models if no API key
-                models = [
-                    {"id": "llama3-70b-8192", "name": "Llama-3 70B"},
-                    {"id": "llama3-8b-8192", "name": "Llama-3 8B"},
-                    {"id": "mixtral-8x7b-32768", "name": "Mixtral 8x7B"},
-                    {"id": "gemma-7b-it", "name": "Gemma 7B"}
-                ]
-            else:
-                # Fetch models from Groq API
-                response = requests.get(
-                    'https://api.groq.com/openai/v1/models',
-                    headers={'Authorization': f'Bearer {api_key}'}
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    models = [
-                        {"id": model["id"], "name": model["id"]} 
-                        for model in data.get("data", [])
-                    ]
-                else:
-                    # Handle error
-                    logger.error(f"Error fetching Groq models: {response.text}")
-                    return jsonify({"error": "Failed to fetch models", "details": response.text}), 400
-        except Exception as e:
-            logger.error(f"Error fetching Groq models: {e}")
-            models = [
-                {"id": "llama3-70b-8192", "name": "Llama-3 70B (Default)"},
-                {"id": "llama3-8b-8192", "name": "Llama-3 8B (Default)"},
-                {"id": "mixtral-8x7b-32768", "name": "Mixtral 8x7B (Default)"},
-                {"id": "gemma-7b-it", "name": "Gemma 7B (Default)"}
-            ]
+    # Check if models are cached
+    cache_key = _models_cache_key(provider_id, api_key)
+    cached = models_cache.get(cache_key)
+    if cached is not None:
+        return _models_response(cached, cacheable)
     
-    # Ollama models
-    elif provider_id == 'ollama':
-        try:
-            # Fetch models from local Ollama instance
-            response = requests.get('http://localhost:11434/api/tags', timeout=3)
-            if response.status_code == 200:
-                data = response.json()
-                models = [
-                    {"id": model["name"], "name": model["name"]} 
-                    for model in data.get("models", [])
-                ]
-            else:
-                # Handle error
-                logger.error(f"Error fetching Ollama models: {response.text}")
-                models = [
-                    {"id": "llama3", "name": "Llama 3 (Ollama not connected)"},
-                    {"id": "mistral", "name": "Mistral (Ollama not connected)"},
-                    {"id": "gemma", "name": "Gemma (Ollama not connected)"},
-                    {"id": "phi", "name": "Phi (Ollama not connected)"}
-                ]
-        except Exception as e:
-            logger.error(f"Error fetching Ollama models: {e}")
-            models = [
-                {"id": "llama3", "name": "Llama 3 (Ollama not connected)"},
-                {"id": "mistral", "name": "Mistral (Ollama not connected)"},
-                {"id": "gemma", "name": "Gemma (Ollama not connected)"},
-                {"id": "phi", "name": "Phi (Ollama not connected)"}
-            ]
-    else:
-        return jsonify({"error": "Unknown provider"}), 400
+    try:
+        if adapter.models_url is None:
+            # No listing endpoint, serve the known models
+            models = adapter.known_models
+        else:
+            headers = adapter.headers(api_key, '')
+            validators = models_validators.get(cache_key)
+            if validators is not None:
+                _, etag, last_modified = validators
+                headers = {**headers}
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
+            
+            for attempt in range(MAX_RETRIES + 1):
+                async with AIO_SESSION.get(
+                    adapter.models_url(api_key),
+                    headers=headers,
+                    timeout=adapter.models_timeout
+                ) as response:
+                    if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+                        continue
+                    
+                    if response.status == 304 and validators is not None:
+                        # Upstream list is unchanged, reuse it without transferring the body
+                        # and keep the validators alive, picking up any refreshed ones
+                        models = validators[0]
+                        models_validators[cache_key] = (
+                            models,
+                            response.headers.get('ETag', etag),
+                            response.headers.get('Last-Modified', last_modified)
+                        )
+                    elif response.status == 200:
+                        models = adapter.parse_models(orjson.loads(await response.read()))
+                        etag = response.headers.get('ETag')
+                        last_modified = response.headers.get('Last-Modified')
+                        if etag or last_modified:
+                            models_validators[cache_key] = (models, etag, last_modified)
+                    else:
+                        # Handle error
+                        details = await response.text()
+                        logger.error(f"Error fetching {adapter.label} models: {details}")
+                        if adapter.requires_key:
+                            return jsonify({"error": "Failed to fetch models", "details": details}), 400
+                        models = _FALLBACK_MODELS[provider_id]
+                    break
+    except Exception as e:
+        logger.error(f"Error fetching {adapter.label} models: {e}")
+        models = _FALLBACK_MODELS[provider_id]
     
     # Cache the result
     models_cache[cache_key] = models
     
-    return jsonify({"models": models})
+    return _models_response(models, cacheable)
+
+@app.route('/api/models/cache', methods=['DELETE'])
+async def clear_models_cache():
+    """Drop all cached model lists so the next request refetches them"""
+    models_cache.clear()
+    models_validators.clear()
+    return jsonify({"success": True, "message": "Model cache cleared"})
 
 @app.route('/api/send_message', methods=['POST'])
-def send_message():
+async def send_message():
     """Send a message to an AI provider"""
-    data = request.json
+    data = await request.get_json()
     
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -825,146 +1230,38 @@ def send_message():
     if not provider_id or not model_id or not message:
         return jsonify({"error": "Missing required parameters"}), 400
     
+    return await _send_provider_message(
+        provider_id, model_id, api_key, message, request.headers.get('Origin', '')
+    )
+
+async def _send_provider_message(provider_id, model_id, api_key, message, origin):
+    """Send a single message to the given provider and build the response"""
+    adapter = PROVIDER_ADAPTERS.get(provider_id)
+    if adapter is None:
+        return jsonify({"error": "Unknown provider"}), 400
+    
+    if adapter.requires_key and not api_key:
+        return jsonify({"error": f"API key required for {adapter.label}"}), 400
+    
     try:
-        # OpenAI
-        if provider_id == 'openai':
-            if not api_key:
-                return jsonify({"error": "API key required for OpenAI"}), 400
-            
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f'Bearer {api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': model_id,
-                    'messages': [{'role': 'user', 'content': message}],
-                    'temperature': 0.7
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return jsonify({
-                    'response': data['choices'][0]['message']['content']
-                })
-            else:
-                return jsonify({"error": "OpenAI API error", "details": response.text}), 400
-                
-        # Anthropic
-        elif provider_id == 'anthropic':
-            if not api_key:
-                return jsonify({"error": "API key required for Anthropic"}), 400
-            
-            client = Anthropic(api_key=api_key)
-            response = client.messages.create(
-                model=model_id,
-                max_tokens=1000,
-                messages=[
-                    {'role': 'user', 'content': message}
-                ]
-            )
-            
-            return jsonify({
-                'response': response.content[0].text
-            })
-            
-        # Gemini
-        elif provider_id == 'gemini':
-            if not api_key:
-                return jsonify({"error": "API key required for Gemini"}), 400
-            
-            response = requests.post(
-                f'https://generativelanguage.googleapis.com/v1beta/models/{model_id}:generateContent?key={api_key}',
-                json={
-                    'contents': [{'parts': [{'text': message}]}],
-                    'generationConfig': {'temperature': 0.7}
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return jsonify({
-                    'response': data['candidates'][0]['content']['parts'][0]['text']
-                })
-            else:
-                return jsonify({"error": "Gemini API error", "details": response.text}), 400
-                
-        # OpenRoute
-        elif provider_id == 'openroute':
-            if not api_key:
-                return jsonify({"error": "API key required for OpenRoute"}), 400
-            
-            response = requests.post(
-                'https://openrouter.ai/api/v1/chat/completions',
-                headers={
-                    'Authorization': f'Bearer {api_key}',
-                    'Content-Type': 'application/json',
-                    'HTTP-Referer': request.headers.get('Origin', ''),
-                    'X-Title': 'MCP Client'
-                },
-                json={
-                    'model': model_id,
-                    'messages': [{'role': 'user', 'content': message}]
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return jsonify({
-                    'response': data['choices'][0]['message']['content']
-                })
-            else:
-                return jsonify({"error": "OpenRoute API error", "details": response.text}), 400
-                
-        # Groq
-        elif provider_id == 'groq':
-            if not api_key:
-                return jsonify({"error": "API key required for Groq"}), 400
-            
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers={
-                    'Authorization': f'Bearer {api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': model_id,
-                    'messages': [{'role': 'user', 'content': message}],
-                    'temperature': 0.7
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return jsonify({
-                    'response': data['choices'][0]['message']['content']
-                })
-            else:
-                return jsonify({"error": "Groq API error", "details": response.text}), 400
-                
-        # Ollama
-        elif provider_id == 'ollama':
-            response = requests.post(
-                'http://localhost:11434/api/generate',
-                json={
-                    'model': model_id,
-                    'prompt': message,
-                    'stream': False
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
+        if adapter.send is not None:
+            return jsonify({'response': await adapter.send(api_key, model_id, message)})
+        
+        async with AIO_SESSION.post(
+            adapter.chat_url(model_id, api_key),
+            headers=adapter.headers(api_key, origin),
+            json=adapter.chat_body(model_id, message),
+            timeout=adapter.chat_timeout
+        ) as response:
+        
+            if response.status == 200:
+                data = orjson.loads(await response.read())
                 return jsonify({
-                    'response': data['response']
+                    'response': adapter.parse_chat(data)
                 })
             else:
-                return jsonify({"error": "Ollama API error", "details": response.text}), 400
-                
-        else:
-            return jsonify({"error": "Unknown provider"}), 400
+                details = await response.text()
+                return jsonify({"error": f"{adapter.label} API error", "details": details}), 400
             
     except Exception as e:
         logger.error(f"Error sending message to {provider_id}: {str(e)}")
@@ -975,60 +1272,11 @@ def send_message():
 # ========================
 
 @app.route('/api/mcp/servers', methods=['GET'])
-@async_route
 async def list_mcp_servers():
     """List available MCP servers"""
     try:
-        # Create response object to capture output
-        class ResponseCapture:
-            def __init__(self):
-                self.output = []
-            
-            def info(self, msg):
-                self.output.append(msg)
-            
-            def error(self, msg):
-                self.output.append(f"ERROR: {msg}")
-
-        # Capture the output from list_servers
-        response_capture = ResponseCapture()
-        
-        # Store original logger.info
-        original_info = logger.info
-        
-        # Replace with our capture
-        logger.info = response_capture.info
-        
-        # List servers
-        await mcp_client.list_servers()
-        
-        # Restore original logger
-        logger.info = original_info
-        
-        # Extract server data from output
-        servers = []
-        current_server = None
-        
-        for line in response_capture.output:
-            if "Available MCP servers:" in line:
-                continue
-                
-            if line.strip().startswith("- "):
-                # This is a server line
-                parts = line.strip()[2:].split(": ")
-                if len(parts) == 2:
-                    server_name = parts[0]
-                    status = parts[1]
-                    current_server = {"name": server_name, "status": status, "tools": []}
-                    servers.append(current_server)
-            
-            elif line.strip().startswith("Tools:"):
-                continue
-                
-            elif current_server and line.strip().startswith("- "):
-                # This is a tool line
-                tool_info = line.strip()[2:].strip()
-                current_server["tools"].append(tool_info)
+        # The client reports each server with its cached tool names directly
+        servers = await mcp_client.list_servers()
         
         return jsonify({"servers": servers})
         
@@ -1037,10 +1285,9 @@ async def list_mcp_servers():
         return jsonify({"error": f"Failed to list MCP servers: {str(e)}"}), 500
 
 @app.route('/api/mcp/connect', methods=['POST'])
-@async_route
 async def connect_to_server():
     """Connect to a specific MCP server"""
-    data = request.json
+    data = await request.get_json()
     
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -1063,7 +1310,6 @@ async def connect_to_server():
         return jsonify({"error": f"Failed to connect to server: {str(e)}"}), 500
 
 @app.route('/api/mcp/connect-all', methods=['POST'])
-@async_route
 async def connect_to_all_servers():
     """Connect to all enabled MCP servers"""
     try:
@@ -1075,7 +1321,6 @@ async def connect_to_all_servers():
         return jsonify({"error": f"Failed to connect to all servers: {str(e)}"}), 500
 
 @app.route('/api/mcp/tools/<server_name>', methods=['GET'])
-@async_route
 async def list_tools(server_name):
     """List tools available on a specific MCP server"""
     try:
@@ -1085,74 +1330,17 @@ async def list_tools(server_name):
             if not success:
                 return jsonify({"error": f"Failed to connect to server {server_name}"}), 400
         
-        # Create response object to capture output
-        class ResponseCapture:
-            def __init__(self):
-                self.output = []
-            
-            def info(self, msg):
-                self.output.append(msg)
-        
-        # Capture the output from list_tools
-        response_capture = ResponseCapture()
-        
-        # Store original logger.info
-        original_info = logger.info
-        
-        # Replace with our capture
-        logger.info = response_capture.info
-        
-        # List tools
-        await mcp_client.list_tools(server_name)
-        
-        # Restore original logger
-        logger.info = original_info
-        
-        # Extract tool data from output
-        tools = []
-        
-        for line in response_capture.output:
-            if f"Tools available on server '{server_name}':" in line:
-                continue
-                
-            if line.strip().startswith("- "):
-                # This is a tool line
-                tool_line = line.strip()[2:].strip()
-                tool_parts = tool_line.split(": ", 1)
-                
-                if len(tool_parts) == 2:
-                    tool_name = tool_parts[0]
-                    tool_description = tool_parts[1]
-                    
-                    tool_info = {
-                        "name": tool_name,
-                        "description": tool_description,
-                        "schema": None
-                    }
-                    
-                    tools.append(tool_info)
-            
-            elif line.strip().startswith("Input schema:"):
-                # This line contains schema information for the previous tool
-                if tools:
-                    schema_text = line.strip()[13:].strip()
-                    try:
-                        schema = json.loads(schema_text.replace("...", ""))
-                        tools[-1]["schema"] = schema
-                    except:
-                        tools[-1]["schema"] = schema_text
-        
-        return jsonify({"tools": tools})
+        # List tools (encoded once per fetch and served from the cache after that)
+        return Response(await mcp_client.tools_payload(server_name), mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error listing tools for server {server_name}: {str(e)}")
         return jsonify({"error": f"Failed to list tools: {str(e)}"}), 500
 
 @app.route('/api/mcp/call_tool', methods=['POST'])
-@async_route
 async def call_tool():
     """Call a tool on an MCP server"""
-    data = request.json
+    data = await request.get_json()
     
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -1171,56 +1359,36 @@ async def call_tool():
             if not success:
                 return jsonify({"error": f"Failed to connect to server {server_name}"}), 400
         
-        # Create response object to capture output
-        class ResponseCapture:
-            def __init__(self):
-                self.output = []
-                self.result = None
-            
-            def info(self, msg):
-                self.output.append(msg)
-        
-        # Capture the output
-        response_capture = ResponseCapture()
-        
-        # Store original print and logger.info
-        original_print = print
-        original_info = logger.info
-        
-        # Replace with our capture
-        def capture_print(*args, **kwargs):
-            text = " ".join(str(arg) for arg in args)
-            response_capture.result = text
-            original_print(*args, **kwargs)
-        
-        print = capture_print
-        logger.info = response_capture.info
-        
         # Call tool
-        await mcp_client.call_tool(server_name, tool_name, args)
-        
-        # Restore original print and logger.info
-        print = original_print
-        logger.info = original_info
+        result = await mcp_client.call_tool(server_name, tool_name, args)
         
-        # Extract result
-        result = response_capture.result
+        if isinstance(result, dict) and "error" in result:
+            return jsonify({"success": False, "error": result["error"]})
         
         return jsonify({
             "success": True,
-            "result": result,
-            "logs": response_capture.output
+            "result": tool_result_payload(result)
         })
         
     except Exception as e:
         logger.error(f"Error calling tool {tool_name} on server {server_name}: {str(e)}")
         return jsonify({"error": f"Failed to call tool: {str(e)}"}), 500
 
+async def _sse_events(events):
+    """Encode AI processing steps as server-sent event frames"""
+    try:
+        async for event in events:
+            yield b"data: " + orjson.dumps(event) + b"\n\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Error processing with AI: {str(e)}")
+        yield b"data: " + orjson.dumps({"type": "error", "content": f"Failed to process with AI: {str(e)}"}) + b"\n\n"
+    yield b"event: done\ndata: {}\n\n"
+
 @app.route('/api/mcp/ai_process', methods=['POST'])
-@async_route
 async def process_with_ai():
     """Process a query using Claude and available MCP tools"""
-    data = request.json
+    data = await request.get_json()
     
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -1234,73 +1402,21 @@ async def process_with_ai():
         # Connect to all servers first
         await mcp_client.connect_to_all_servers()
         
-        # Create response object to capture output
-        class ResponseCapture:
-            def __init__(self):
-                self.output = []
-                self.final_response = ""
-            
-            def info(self, msg):
-                self.output.append({"type": "info", "content": msg})
-            
-            def tool_call(self, tool, args):
-                self.output.append({"type": "tool_call", "tool": tool, "args": args})
-            
-            def tool_result(self, result):
-                self.output.append({"type": "tool_result", "content": result})
-            
-            def response(self, text):
-                self.output.append({"type": "response", "content": text})
-                self.final_response += text
-        
-        # Capture the output
-        response_capture = ResponseCapture()
-        
-        # Store original print and logger.info
-        original_print = print
-        original_info = logger.info
-        
-        # Replace with our capture
-        def capture_print(*args, **kwargs):
-            text = " ".join(str(arg) for arg in args)
-            if "[Calling tool" in text:
-                # Extract tool call information
-                parts = text.split("with args", 1)
-                if len(parts) == 2:
-                    tool = parts[0].replace("[Calling tool", "").strip()
-                    args_text = parts[1].replace("]", "").strip()
-                    try:
-                        args = json.loads(args_text)
-                    except:
-                        args = args_text
-                    response_capture.tool_call(tool, args)
-            elif "Tool result:" in text:
-                response_capture.tool_result(text.replace("Tool result:", "").strip())
-            elif "Final response:" in text:
-                # Don't capture this header
-                pass
-            else:
-                response_capture.response(text)
-            
-            original_print(*args, **kwargs)
-        
-        print = capture_print
-        logger.info = response_capture.info
-        
-        # Process with AI
-        if mcp_client.anthropic:
-            await mcp_client.process_with_ai(query)
-        else:
+        if not mcp_client.anthropic:
             return jsonify({"error": "AI processing not available. Set ANTHROPIC_API_KEY in .env file"}), 400
         
-        # Restore original print and logger.info
-        print = original_print
-        logger.info = original_info
+        # Clients that accept an event stream get each step as soon as it happens
+        if request.accept_mimetypes.best == 'text/event-stream':
+            headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            return Response(_sse_events(mcp_client.process_with_ai(query)), mimetype='text/event-stream', headers=headers)
+        
+        # Collect the steps the client yields while processing
+        steps = [step async for step in mcp_client.process_with_ai(query)]
         
         return jsonify({
             "success": True,
-            "response": response_capture.final_response,
-            "steps": response_capture.output
+            "response": "\n".join(step["content"] for step in steps if step["type"] == "response"),
+            "steps": steps
         })
         
     except Exception as e:
@@ -1308,6 +1424,9 @@ async def process_with_ai():
         return jsonify({"error": f"Failed to process with AI: {str(e)}"}), 500
 
 # Run the application
+# For production, run.py serves the app with Hypercorn, or: hypercorn --worker-class uvloop api:app --bind 0.0.0.0:5000
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # The debugger and reloader are opt-in
+    debug = os.environ.get('MCP_DEBUG') == '1'
+    app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=debug)
@@ -6,13 +6,22 @@ Loads the correct dependencies and starts the MCP Client API server
 
 import os
 import sys
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+# Configure logging; records are queued and written to stderr by a background
+# listener thread, so request handlers never block on console I/O
+log_queue = SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
 
-# Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger('mcp_server')
 
@@ -36,6 +45,7 @@ logger.info("==================================================")
 try:
     logger.info("Applying asyncio stdio_client patch...")
     import stdio_patch
+    stdio_patch.apply_patch()
 except ImportError as e:
     logger.warning(f"Could not import stdio_patch module: {e}")
     logger.warning("Will continue without the asyncio patch applied")
@@ -43,10 +53,48 @@ except ImportError as e:
 # Import and run the API server
 try:
     import api
-    # Explicitly run the Flask app instead of just importing the module
     port = int(os.environ.get('PORT', 5000))
-    logger.info(f"Starting Flask application on port {port}")
-    api.app.run(host='0.0.0.0', port=port, debug=True)
+    
+    if os.environ.get('MCP_DEBUG') == '1':
+        # Quart's reloading development server
+        logger.info(f"Starting Quart development server on port {port}")
+        api.app.run(host='0.0.0.0', port=port, debug=True)
+    else:
+        import asyncio
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+        
+        config = Config()
+        config.bind = [f"0.0.0.0:{port}"]
+        # Hand Hypercorn our loggers so its access and error records go
+        # through the queue instead of a synchronous stdout handler
+        config.accesslog = logging.getLogger('hypercorn.access')
+        config.errorlog = logging.getLogger('hypercorn.error')
+        
+        # uvloop is optional (not available on Windows); it reaps MCP server
+        # subprocesses through libuv, so no child watcher is involved
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            logger.info("Using uvloop event loop")
+        except ImportError:
+            if sys.platform == 'win32':
+                # Subprocess pipes need the IOCP-based proactor loop
+                asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+            elif sys.version_info < (3, 12) and hasattr(os, 'pidfd_open'):
+                # Before 3.12 the default watcher parks a thread in waitpid() for every
+                # MCP server; pidfds let the loop itself wait on each child
+                try:
+                    os.close(os.pidfd_open(os.getpid()))
+                    asyncio.set_child_watcher(asyncio.PidfdChildWatcher())
+                    logger.info("Using pidfd child watcher for MCP server processes")
+                except OSError:
+                    pass
+        
+        # A single process keeps one set of MCP server subprocesses; for more workers use
+        # hypercorn --worker-class uvloop --workers N api:app
+        logger.info(f"Starting Quart application with Hypercorn on port {port}")
+        asyncio.run(serve(api.app, config))
 except ImportError as e:
     logger.error(f"Failed to import API module: {e}")
     logger.error("Make sure all dependencies are installed. Try: pip install -r requirements.txt")
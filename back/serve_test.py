@@ -8,9 +8,21 @@ PORT = 8000
 # Change to the directory containing this script
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-# Set up a simple HTTP server
+class TestServer(http.server.ThreadingHTTPServer):
+    """Threaded server that skips HTTPServer's reverse-DNS lookup of its own address"""
+    allow_reuse_address = True
+    
+    def server_bind(self):
+        # HTTPServer.server_bind calls socket.getfqdn(), which can block for seconds
+        # on networks without reverse DNS
+        socketserver.TCPServer.server_bind(self)
+        host, port = self.server_address[:2]
+        self.server_name = host
+        self.server_port = port
+
+# Set up a simple HTTP server; threaded so the page's assets load in parallel
 Handler = http.server.SimpleHTTPRequestHandler
-httpd = socketserver.TCPServer(("", PORT), Handler)
+httpd = TestServer(("", PORT), Handler)
 
 print(f"Serving at http://localhost:{PORT}")
 print(f"Access the test page at http://localhost:{PORT}/test.html")
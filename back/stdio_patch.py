@@ -6,35 +6,80 @@ This patch replaces the stdio_client with a custom implementation that avoids th
 
 import os
 import sys
+import codecs
 import asyncio
 import logging
 import anyio
-from anyio.streams.text import TextReceiveStream
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from contextlib import asynccontextmanager
-from typing import Literal
+from typing import Literal, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mcp.client.stdio import StdioServerParameters
 
 logger = logging.getLogger('mcp_api')
 
-# Import necessary types from MCP
-try:
-    import mcp.types as types
-    from mcp.client.stdio import StdioServerParameters
-    from mcp.client.session import ClientSession
-    from mcp.client.stdio import get_default_environment
-except ImportError:
-    logger.error("MCP SDK not found, cannot apply patch")
-    raise
+# Messages that can wait in each direction before the producer blocks
+STREAM_BUFFER_SIZE = 256
+
+# Queued outgoing messages are coalesced into one stdin write up to this many bytes
+STDIN_FLUSH_SIZE = 65536
+
+# The MCP SDK is imported lazily (in apply_patch and on first use) so importing this
+# module stays cheap when the patch is disabled
+
+# get_default_environment() filters os.environ on every call; reuse its result until
+# the environment visibly changes
+_default_env = None
+_default_env_size = -1
+
+def default_environment():
+    """Cached get_default_environment(), recomputed when os.environ grows or shrinks"""
+    global _default_env, _default_env_size
+    if _default_env is None or _default_env_size != len(os.environ):
+        from mcp.client.stdio import get_default_environment
+        _default_env = get_default_environment()
+        _default_env_size = len(os.environ)
+    return _default_env
+
+# Linux-only fcntl command and the pipe size requested for server stdout
+F_SETPIPE_SZ = 1031
+STDOUT_PIPE_SIZE = 1 << 20
+
+def grow_stdout_pipe(pid):
+    """
+    Raise the capacity of a child's stdout pipe so large tool responses arrive in
+    fewer reads. anyio doesn't expose the pipe's fd, so open it through /proc
+    """
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        import fcntl
+        fd = os.open(f"/proc/{pid}/fd/1", os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            fcntl.fcntl(fd, F_SETPIPE_SZ, STDOUT_PIPE_SIZE)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        # Capped by /proc/sys/fs/pipe-max-size, or the process already exited
+        logger.debug(f"Could not resize stdout pipe for process {pid}: {e}")
 
 # Custom implementation of stdio_client to avoid task scope issues
 @asynccontextmanager
-async def robust_stdio_client(server: StdioServerParameters):
+async def robust_stdio_client(server: "StdioServerParameters"):
     """
     Custom implementation of stdio_client that avoids task scope issues
     by using a more robust approach to task management
     """
-    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
-    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+    import mcp.types as types
+    
+    # pydantic-core serializer for outgoing messages; produces UTF-8 JSON bytes directly
+    to_json = types.JSONRPCMessage.__pydantic_serializer__.to_json
+    
+    # Bounded buffers let a burst of messages cross without a task switch per message,
+    # while still applying backpressure to a runaway producer
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(STREAM_BUFFER_SIZE)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(STREAM_BUFFER_SIZE)
 
     process = None
     tg = None
@@ -43,9 +88,10 @@ async def robust_stdio_client(server: StdioServerParameters):
         # Open the process with the given parameters
         process = await anyio.open_process(
             [server.command, *server.args],
-            env=server.env if server.env is not None else get_default_environment(),
+            env=server.env if server.env is not None else default_environment(),
             stderr=sys.stderr,
         )
+        grow_stdout_pipe(process.pid)
         
         async def stdout_reader():
             try:
@@ -53,31 +99,49 @@ async def robust_stdio_client(server: StdioServerParameters):
                     logger.error("Process or stdout is missing")
                     return
                     
-                buffer = ""
-                async for chunk in TextReceiveStream(
-                    process.stdout,
-                    encoding=server.encoding,
-                    errors=server.encoding_error_handler,
-                ):
-                    lines = (buffer + chunk).split("\n")
-                    buffer = lines.pop()
-
-                    for line in lines:
+                # Accumulate raw bytes and scan for newlines in place; pydantic parses
+                # UTF-8 bytes directly, so lines are only decoded for other encodings
+                buffer = bytearray()
+                find = buffer.find
+                parse = types.JSONRPCMessage.model_validate_json
+                send = read_stream_writer.send
+                warn = logger.warning
+                decode_lines = (
+                    codecs.lookup(server.encoding).name != "utf-8"
+                    or server.encoding_error_handler != "strict"
+                )
+                
+                async for chunk in process.stdout:
+                    buffer += chunk
+                    start = 0
+                    newline = find(b"\n")
+                    while newline != -1:
+                        line = bytes(buffer[start:newline])
+                        start = newline + 1
+                        newline = find(b"\n", start)
+                        
                         try:
-                            message = types.JSONRPCMessage.model_validate_json(line)
-                            await read_stream_writer.send(message)
+                            if decode_lines:
+                                line = line.decode(server.encoding, server.encoding_error_handler)
+                            message = parse(line)
                         except Exception as exc:
-                            logger.warning(f"Error parsing JSON-RPC message: {exc}")
-                            try:
-                                await read_stream_writer.send(exc)
-                            except:
-                                pass
-            except (anyio.ClosedResourceError, asyncio.CancelledError):
+                            # Log and drop; the session has no use for the exception object
+                            warn(f"Dropping malformed JSON-RPC line: {exc}")
+                            continue
+                        
+                        # A closed session ends the reader through the handler below
+                        await send(message)
+                    
+                    # Drop the consumed lines once per chunk, keeping any partial line
+                    if start:
+                        del buffer[:start]
+                
+                # stdout hit EOF: the server has exited, so let the session see the end
+                await read_stream_writer.aclose()
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError, asyncio.CancelledError):
                 logger.info("stdout_reader task cancelled")
             except Exception as e:
                 logger.error(f"Error in stdout_reader: {e}")
-            finally:
-                await anyio.lowlevel.checkpoint()
 
         async def stdin_writer():
             try:
@@ -85,20 +149,46 @@ async def robust_stdio_client(server: StdioServerParameters):
                     logger.error("Process or stdin is missing")
                     return
                     
-                async for message in write_stream_reader:
-                    json = message.model_dump_json(by_alias=True, exclude_none=True)
-                    await process.stdin.send(
-                        (json + "\n").encode(
+                # Messages are appended straight into one reusable buffer, so a UTF-8
+                # message costs a single allocation (the serializer's output)
+                if codecs.lookup(server.encoding).name == "utf-8":
+                    def encode_into(buffer, message):
+                        buffer += to_json(message, by_alias=True, exclude_none=True)
+                        buffer += b"\n"
+                else:
+                    def encode_into(buffer, message):
+                        json = to_json(message, by_alias=True, exclude_none=True).decode()
+                        buffer += (json + "\n").encode(
                             encoding=server.encoding,
                             errors=server.encoding_error_handler,
                         )
-                    )
+                
+                send = process.stdin.send
+                buffer = bytearray()
+                async for message in write_stream_reader:
+                    encode_into(buffer, message)
+                    
+                    # Fold in whatever is already queued so a burst costs one write;
+                    # never wait for more, so a lone message goes out immediately
+                    finished = False
+                    while len(buffer) < STDIN_FLUSH_SIZE:
+                        try:
+                            encode_into(buffer, write_stream_reader.receive_nowait())
+                        except anyio.WouldBlock:
+                            break
+                        except anyio.EndOfStream:
+                            finished = True
+                            break
+                    
+                    # The transport has copied or written the data once send() returns
+                    await send(buffer)
+                    buffer.clear()
+                    if finished:
+                        break
             except (anyio.ClosedResourceError, asyncio.CancelledError):
                 logger.info("stdin_writer task cancelled")
             except Exception as e:
                 logger.error(f"Error in stdin_writer: {e}")
-            finally:
-                await anyio.lowlevel.checkpoint()
         
         # Create a task group for the reader and writer tasks
         tg = anyio.create_task_group()
@@ -116,31 +206,46 @@ async def robust_stdio_client(server: StdioServerParameters):
         raise
     
     finally:
-        # Clean up resources in the correct order
+        # Clean up resources in the correct order: unblock the reader/writer first so
+        # the task group can exit immediately instead of waiting on pipe I/O
         try:
-            # 1. Cancel and close task group if it exists
+            # 1. Terminate the process and close its stdin
+            if process is not None:
+                try:
+                    process.terminate()
+                except ProcessLookupError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Error terminating process: {e}")
+                try:
+                    if process.stdin is not None:
+                        await process.stdin.aclose()
+                except Exception as e:
+                    logger.warning(f"Error closing process stdin: {e}")
+            
+            # 2. Signal EOF to the session before waiting on the tasks
+            try:
+                if read_stream_writer is not None:
+                    await read_stream_writer.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing read stream writer: {e}")
+            
+            # 3. Cancel and close task group if it exists (cancel() is synchronous)
             if tg is not None and hasattr(tg, 'cancel_scope'):
                 try:
-                    await tg.cancel_scope.cancel()
+                    tg.cancel_scope.cancel()
                     await tg.__aexit__(None, None, None)
                 except Exception as e:
                     logger.warning(f"Error closing task group: {e}")
             
-            # 2. Close process if it exists
+            # 4. Reap the process
             if process is not None:
                 try:
-                    process.terminate()
                     await process.aclose()
                 except Exception as e:
                     logger.warning(f"Error closing process: {e}")
             
-            # 3. Close streams
-            try:
-                if read_stream_writer is not None:
-                    await read_stream_writer.aclose()
-            except Exception as e:
-                logger.warning(f"Error closing read stream writer: {e}")
-                
+            # 5. Close the remaining stream
             try:
                 if write_stream_reader is not None:
                     await write_stream_reader.aclose()
@@ -153,6 +258,9 @@ async def robust_stdio_client(server: StdioServerParameters):
 # Apply the patch by replacing the original function with our robust version
 def apply_patch():
     """Apply the patch to the MCP SDK by replacing the original stdio_client function"""
+    if os.environ.get('MCP_DISABLE_STDIO_PATCH'):
+        logger.info("stdio_client patch disabled by MCP_DISABLE_STDIO_PATCH")
+        return False
     try:
         import mcp.client.stdio
         mcp.client.stdio.stdio_client = robust_stdio_client
@@ -161,6 +269,3 @@ def apply_patch():
     except Exception as e:
         logger.error(f"Failed to apply stdio_client patch: {e}")
         return False
-
-# Auto-apply the patch when this module is imported
-apply_patch()